@@ -1,187 +1,901 @@
-import time
+import os
+import csv
+import json
+import html
+import base64
+import asyncio
+import hashlib
+import numpy as np
 import pandas as pd
 import re
-import random
+import httpx
+from urllib.parse import urlparse, parse_qs
+from selectolax.lexbor import LexborHTMLParser
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
-from datetime import datetime
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException, \
+    SessionNotCreatedException
+from datetime import datetime, timedelta, timezone
 from webdriver_manager.chrome import ChromeDriverManager
 
+try:
+    import hyperscan
+except ImportError:
+    # Optional, parse_earthquake_tweet falls back to the re module without it
+    hyperscan = None
+
+# Collects text, posting time and status URL of every rendered tweet in one call
+EXTRACT_TWEETS_JS = """
+return Array.from(document.querySelectorAll('article')).map(function (article) {
+    var textNodes = article.querySelectorAll("div[data-testid*='tweetText']");
+    if (!textNodes.length) {
+        textNodes = article.querySelectorAll("div[lang*='en'], div[lang*='tl']");
+    }
+    var time = article.querySelector('time');
+    var link = article.querySelector('a[href*="/status/"]');
+    return {
+        text: Array.from(textNodes).map(function (node) { return node.innerText; }).join(' '),
+        datetime: time ? (time.getAttribute('datetime') || time.innerText) : null,
+        url: link ? link.href : null
+    };
+});
+"""
+
+# Columns of the raw tweets CSV written by the scrapers
+RAW_TWEET_COLUMNS = ['tweet_text', 'datetime', 'tweet_url', 'magnitude', 'depth', 'location', 'date_time',
+                     'intensity', 'scrape_datetime']
+
+# Keywords that mark a tweet as earthquake related, matched in one case-insensitive pass
+EARTHQUAKE_KEYWORDS_RE = re.compile(r'EARTHQUAKE|MAGNITUDE|LINDOL|INTENSITY|PHIVOLCS|SEISMIC|TREMOR', re.IGNORECASE)
+
+# Labels of each field parsed by parse_earthquake_tweet, in order of preference. Full labels are tried
+# before the one-letter abbreviations, which must start a word. Whitespace after a label never crosses
+# a line so an empty label cannot take the next line as its value.
+TWEET_FIELD_LABELS = {
+    'magnitude': (r'Magnitude(?:[ \t]*[=:][ \t]*|[ \t]+)', r'\bM(?:[=:][ \t]*|[ \t]+)'),
+    'depth': (r'(?:Depth(?:[ \t]*[=:][ \t]*|[ \t]+)|depth of[ \t]+)', r'\bD[=:][ \t]*'),
+    'location': (r'Location[ \t]*[=:][ \t]*', r'\bL[=:][ \t]*'),
+    'date_time': (r'(?:Date[ \t]*and[ \t]*Time[ \t]*[=:]|Date[=:]|Occurred on)[ \t]*',),
+    'intensity': (r'(?:Reported )?Intensity[ \t]*[=:][ \t]*',)
+}
+
+# Value following the label of each field
+TWEET_FIELD_VALUES = {
+    'magnitude': r'\d+\.?\d*',
+    'depth': r'\d+[ \t]*km',
+    'location': r'\S[^\n]*',
+    'date_time': r'\S[^\n]*',
+    'intensity': r'\S[^\n]*'
+}
+
+# Regexes of each field, one per label and in the same order. ASCII classes keep them in step with Hyperscan.
+TWEET_FIELD_PATTERNS = {
+    field: [re.compile(f'{label}(?P<{field}>{TWEET_FIELD_VALUES[field]})', re.IGNORECASE | re.ASCII)
+            for label in labels]
+    for field, labels in TWEET_FIELD_LABELS.items()
+}
+
+# Substrings one of which every match of a field contains, checked case-sensitively in lower, title and
+# upper case so the tweet never has to be lowercased. Magnitude and location have one-letter labels and
+# no useful anchor.
+TWEET_FIELD_ANCHORS = {
+    'depth': ('km', 'KM', 'Km'),
+    'date_time': ('Date', 'date', 'DATE', 'ccurred', 'CCURRED'),
+    'intensity': ('ntensity', 'NTENSITY')
+}
+
+# (field, label index) of every field regex, in the order they are numbered in the Hyperscan database
+TWEET_FIELD_PATTERN_IDS = [(field, index) for field, patterns in TWEET_FIELD_PATTERNS.items()
+                           for index in range(len(patterns))]
+
+# Value regex of each field, matched where Hyperscan found one of its labels
+TWEET_FIELD_VALUE_PATTERNS = {field: re.compile(f'(?P<{field}>{value})', re.IGNORECASE | re.ASCII)
+                              for field, value in TWEET_FIELD_VALUES.items()}
+
+# First character of each value, compiled after the labels so a Hyperscan match ends right at the value
+TWEET_FIELD_VALUE_STARTS = {
+    'magnitude': r'\d',
+    'depth': r'\d',
+    'location': r'\S',
+    'date_time': r'\S',
+    'intensity': r'\S'
+}
+
+
+def compile_tweet_field_database():
+    """
+    Compiles the labels of every field of parse_earthquake_tweet into one Hyperscan database
+    so a tweet can be scanned for all of them in a single pass
+
+    Returns:
+        hyperscan.Database: Compiled database, or None if Hyperscan is not installed
+    """
+    if hyperscan is None:
+        return None
+
+    # Only the labels go into the database, with single-match each one is reported once per tweet
+    # instead of at every character of an open-ended value
+    expressions = [f'{TWEET_FIELD_LABELS[field][index]}{TWEET_FIELD_VALUE_STARTS[field]}'.encode()
+                   for field, index in TWEET_FIELD_PATTERN_IDS]
+
+    database = hyperscan.Database()
+    database.compile(
+        expressions=expressions,
+        ids=list(range(len(expressions))),
+        elements=len(expressions),
+        flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH] * len(expressions)
+    )
+    return database
+
+
+def record_label_match(pattern_id, start, end, flags, context):
+    """
+    Hyperscan match handler, stores the end offset of the first match of each label in context
+    """
+    context[pattern_id] = end
+
+
+TWEET_FIELD_DATABASE = compile_tweet_field_database()
+
+# Regex for each field read by clean_earthquake_data
+# Values stay on the label's line and must not be empty, so a bare label never takes the next line.
+# Each pattern starts with its label so re can skip ahead to it, an optional "Reported " before
+# "Intensity" would not change the value but makes re try a match at every character.
+TEXT_FIELD_PATTERNS = {field: re.compile(pattern, re.IGNORECASE | re.ASCII) for field, pattern in {
+    'date_time': r"(?:Date(?:[ \t]*and[ \t]*Time)?|Occurred on)[ \t]*[=:][ \t]*(?P<date_time>\S[^\n]*)",
+    'magnitude': r"Magnitude[ \t]*[=:][ \t]*(?P<magnitude>[0-9.]+)",
+    'depth': r"Depth[ \t]*[=:][ \t]*(?P<depth>[0-9]+[ \t]*km)",
+    'location': r"Location[ \t]*[=:][ \t]*(?P<location>\S[^\n]*)",
+    'intensity': r"Intensity[ \t]*[=:][ \t]*(?P<intensity>\S[^\n]*)"
+}.items()}
+
+# Maps the field group names to the columns of the cleaned data
+TEXT_FIELD_COLUMNS = {
+    'date_time': "Date and Time",
+    'magnitude': "Magnitude",
+    'depth': "Depth",
+    'location': "Location",
+    'intensity': "Intensity"
+}
+
+
+def is_earthquake_tweet(tweet_text):
+    """
+    Checks whether a tweet looks like an earthquake information post
+
+    Args:
+        tweet_text (str): Tweet text
+
+    Returns:
+        bool: True if the text mentions any earthquake-related keyword
+    """
+    return EARTHQUAKE_KEYWORDS_RE.search(tweet_text) is not None
+
+
+def tweet_fingerprint(tweet_url):
+    """
+    Computes a 64-bit fingerprint of a tweet URL (the first 8 bytes of its SHA-1) used to skip duplicates
+
+    Args:
+        tweet_url (str): URL of the tweet
+
+    Returns:
+        int: Unsigned 64-bit fingerprint
+    """
+    return int.from_bytes(hashlib.sha1(tweet_url.encode('utf-8')).digest()[:8], 'big')
+
+
+def load_seen_fingerprints(path):
+    """
+    Loads the fingerprints of tweets collected by previous runs
+
+    Args:
+        path (str): Path of the .npy file, None to start from scratch
+
+    Returns:
+        set: Set of tweet fingerprints
+    """
+    if not path or not os.path.exists(path):
+        return set()
+
+    try:
+        fingerprints = set(np.load(path).tolist())
+        print(f"Loaded {len(fingerprints)} previously seen tweets from {path}")
+        return fingerprints
+    except Exception as e:
+        print(f"Error loading seen tweets from {path}: {e}")
+        return set()
+
+
+def save_seen_fingerprints(fingerprints, path):
+    """
+    Saves tweet fingerprints as a uint64 .npy file so later runs only collect new tweets
+
+    Args:
+        fingerprints (set): Set of tweet fingerprints
+        path (str): Path of the .npy file, None to skip saving
+    """
+    if not path:
+        return
+
+    try:
+        np.save(path, np.fromiter(fingerprints, dtype=np.uint64, count=len(fingerprints)))
+    except Exception as e:
+        print(f"Error saving seen tweets to {path}: {e}")
+
+
+def timestamped_filename(filename):
+    """
+    Adds the current timestamp to a filename to avoid overwriting previous results
+
+    Args:
+        filename (str): Filename such as "data.csv"
+
+    Returns:
+        str: Filename such as "data_20240105_030400.csv"
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return f"{filename.split('.')[0]}_{timestamp}.{filename.split('.')[1]}"
+
+
+def open_tweet_writer(path):
+    """
+    Opens the raw tweets CSV for streaming, one row is written and flushed per tweet
+
+    Args:
+        path (str): Output filename
+
+    Returns:
+        tuple: (open file, csv.DictWriter with the header already written)
+    """
+    output = open(path, 'w', newline='', encoding='utf-8')
+    writer = csv.DictWriter(output, fieldnames=RAW_TWEET_COLUMNS)
+    writer.writeheader()
+    output.flush()
+    return output, writer
+
+
+def load_raw_tweets(path):
+    """
+    Reads back the raw tweets CSV written by the scrapers, sorted most recent first
+
+    Args:
+        path (str): Raw tweets CSV filename
+
+    Returns:
+        DataFrame: DataFrame containing earthquake information tweets
+    """
+    df = pd.read_csv(path, dtype=str, encoding='utf-8')
+
+    # Sort tweets by datetime to ensure most recent first
+    if not df.empty and 'datetime' in df.columns:
+        try:
+            # Tweet times are ISO-8601 (e.g. 2024-01-05T03:04:00.000Z), parse them on the fast path
+            df['datetime'] = pd.to_datetime(df['datetime'], format='ISO8601', utc=True, errors='coerce', cache=True)
+            # Stable descending argsort on the raw int64 nanoseconds, ~ flips the order and keeps NaT last
+            timestamps = df['datetime'].values.astype('datetime64[ns]').view('i8')
+            order = np.argsort(~timestamps, kind='stable')
+            df = df.take(order).reset_index(drop=True)
+        except Exception as e:
+            print(f"Error sorting by datetime: {e}")
+
+    return df
+
+
+def parse_nitter_date(title):
+    """
+    Converts a Nitter date tooltip (e.g. "Jan 5, 2024 · 3:04 AM UTC") to the ISO-8601 format used by X
+
+    Args:
+        title (str): Value of the title attribute of a Nitter tweet date link
+
+    Returns:
+        str: ISO-8601 datetime string, or the original title if it cannot be parsed
+    """
+    if not title:
+        return None
+
+    try:
+        return datetime.strptime(title, "%b %d, %Y · %I:%M %p %Z").strftime("%Y-%m-%dT%H:%M:%S.000Z")
+    except ValueError:
+        return title
+
+
+async def fetch_timeline(client, user, cursor=None, base_url="https://nitter.net", since=None, until=None):
+    """
+    Fetches and parses one page of a user's timeline from a Nitter instance
+
+    Args:
+        client (httpx.AsyncClient): HTTP client used for the request
+        user (str): Twitter/X handle without the @
+        cursor (str): Pagination cursor from the previous page, None for the first page
+        base_url (str): Base URL of the Nitter instance
+        since (str): Only tweets on or after this date (YYYY-MM-DD), searches the user's tweets when set
+        until (str): Only tweets before this date (YYYY-MM-DD), searches the user's tweets when set
+
+    Returns:
+        tuple: (list of dicts with text, datetime and url keys, cursor of the next page or None)
+    """
+    if since or until:
+        url = f"{base_url}/{user}/search"
+        params = {'f': 'tweets', 'q': '', 'since': since or '', 'until': until or ''}
+    else:
+        url = f"{base_url}/{user}"
+        params = {}
+
+    if cursor:
+        params['cursor'] = cursor
+
+    response = await client.get(url, params=params)
+    response.raise_for_status()
+
+    tree = LexborHTMLParser(response.text)
+    tweets = []
+
+    for item in tree.css('.timeline-item'):
+        content = item.css_first('.tweet-content')
+        link = item.css_first('.tweet-link')
+        if content is None or link is None:
+            continue
+
+        href = link.attributes.get('href')
+        if not href or '/status/' not in href:
+            continue
+
+        date_link = item.css_first('.tweet-date a')
+        tweets.append({
+            'text': content.text().strip(),
+            'datetime': parse_nitter_date(date_link.attributes.get('title')) if date_link else None,
+            # Point back at x.com so URLs match the ones collected by the Selenium scraper
+            'url': f"https://x.com{href.split('#')[0]}"
+        })
+
+    # The "Load more" link at the bottom of the timeline carries the next cursor
+    next_cursor = None
+    for more_link in tree.css('.show-more a'):
+        cursor_values = parse_qs(urlparse(more_link.attributes.get('href') or '').query).get('cursor')
+        if cursor_values:
+            next_cursor = cursor_values[0]
+
+    return tweets, next_cursor
+
+
+async def fetch_window(client, semaphore, user, base_url, since, until, max_pages, max_tweets, seen_fingerprints):
+    """
+    Follows the cursor chain of the user's tweets between two dates
+
+    Args:
+        client (httpx.AsyncClient): HTTP client used for the requests
+        semaphore (asyncio.Semaphore): Limits the number of requests in flight across windows
+        user (str): Twitter/X handle without the @
+        base_url (str): Base URL of the Nitter instance
+        since (str): First date of the window (YYYY-MM-DD)
+        until (str): Day after the last date of the window (YYYY-MM-DD)
+        max_pages (int): Maximum number of pages to follow
+        max_tweets (int): Stop once the window holds this many new earthquake tweets
+        seen_fingerprints (set): Fingerprints of tweets already collected, only read
+
+    Returns:
+        list: Tweets of the window, most recent first
+    """
+    tweets = []
+    cursor = None
+    new_earthquake_tweets = 0
+
+    for page in range(1, max_pages + 1):
+        async with semaphore:
+            try:
+                page_tweets, cursor = await fetch_timeline(client, user, cursor, base_url, since, until)
+            except httpx.HTTPError as e:
+                print(f"Error fetching page {page} of {since} to {until}: {e}")
+                break
+
+        tweets.extend(page_tweets)
+        new_earthquake_tweets += sum(
+            1 for tweet in page_tweets
+            if tweet['text'] and is_earthquake_tweet(tweet['text'])
+            and tweet_fingerprint(tweet['url']) not in seen_fingerprints
+        )
+
+        if new_earthquake_tweets >= max_tweets or not cursor or not page_tweets:
+            break
+
+    return tweets
+
+
+def write_nitter_tweets(tweets, max_tweets, tweets_saved, seen_fingerprints, output, writer, scrape_datetime):
+    """
+    Writes the new earthquake tweets of a window to the raw tweets CSV
+
+    Args:
+        tweets (list): Tweets returned by fetch_window
+        max_tweets (int): Maximum number of tweets to write overall
+        tweets_saved (int): Number of tweets already written
+        seen_fingerprints (set): Fingerprints of tweets already collected, updated in place
+        output (file): Open raw tweets CSV, flushed after each tweet
+        writer (csv.DictWriter): Writer for the raw tweets CSV
+        scrape_datetime (str): Time the scrape started
+
+    Returns:
+        int: Number of tweets written overall
+    """
+    for tweet in tweets:
+        if tweets_saved >= max_tweets:
+            break
+
+        tweet_text = tweet['text']
+        tweet_url = tweet['url']
+
+        if not tweet_text or not is_earthquake_tweet(tweet_text):
+            continue
+
+        fingerprint = tweet_fingerprint(tweet_url)
+        if fingerprint not in seen_fingerprints:
+            seen_fingerprints.add(fingerprint)
+
+            writer.writerow({
+                'tweet_text': tweet_text,
+                'datetime': tweet['datetime'],
+                'tweet_url': tweet_url,
+                **parse_earthquake_tweet(tweet_text),
+                'scrape_datetime': scrape_datetime
+            })
+            output.flush()
+            tweets_saved += 1
+            print(f"Earthquake tweet found! Total: {tweets_saved}")
+
+    return tweets_saved
+
+
+async def scrape_nitter_timeline(user, base_url, max_tweets, max_pages, num_windows, window_days, concurrency,
+                                 seen_fingerprints, output, writer, prefetch_windows=1):
+    """
+    Fetches date windows of the user's tweets, newest first, and writes earthquake tweets until
+    enough are collected. The newest window is fetched on its own, the older ones are only fetched
+    when it does not hold enough tweets, one after the other with up to prefetch_windows windows
+    fetched ahead, and the ones still in flight are cancelled once max_tweets is reached.
+
+    Args:
+        user (str): Twitter/X handle without the @
+        base_url (str): Base URL of the Nitter instance
+        max_tweets (int): Maximum number of tweets to write
+        max_pages (int): Maximum number of pages to follow in each date window
+        num_windows (int): Number of date windows, going back from today
+        window_days (int): Length of each date window in days
+        concurrency (int): Maximum number of requests in flight at once
+        seen_fingerprints (set): Fingerprints of tweets already collected, updated in place
+        output (file): Open raw tweets CSV, flushed after each tweet
+        writer (csv.DictWriter): Writer for the raw tweets CSV
+        prefetch_windows (int): Number of older windows fetched ahead of the one being written
+
+    Returns:
+        int: Number of tweets written, or None if Nitter returned no tweets at all
+    """
+    scrape_datetime = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    headers = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/90.0.4430.212 Safari/537.36"
+    }
+
+    # Each window has its own cursor chain, so windows can be paged through in parallel
+    until = datetime.now(timezone.utc).date() + timedelta(days=1)
+    windows = []
+    for _ in range(num_windows):
+        since = until - timedelta(days=window_days)
+        windows.append((since.isoformat(), until.isoformat()))
+        until = since
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(http2=True, headers=headers, timeout=15, follow_redirects=True) as client:
+        # The newest window usually holds enough tweets, which costs as many requests as paging the timeline
+        since, until = windows[0]
+        tweets = await fetch_window(client, semaphore, user, base_url, since, until, max_pages, max_tweets,
+                                    seen_fingerprints)
+        print(f"Fetched {len(tweets)} tweets from {since} to {until}.")
+
+        # PHIVOLCS posts every day, an empty newest window means the instance is down or blocked
+        if not tweets:
+            return None
+
+        tweets_saved = write_nitter_tweets(tweets, max_tweets, 0, seen_fingerprints, output, writer,
+                                           scrape_datetime)
+
+        if tweets_saved >= max_tweets or len(windows) == 1:
+            return tweets_saved
+
+        # Start the older windows lazily, each asked for the tweets still missing when it starts, so a
+        # public instance only sees the requests that are needed plus the few windows fetched ahead
+        older_windows = windows[1:]
+        tasks = []
+
+        try:
+            for index, (since, until) in enumerate(older_windows):
+                while len(tasks) < min(index + 1 + prefetch_windows, len(older_windows)):
+                    next_since, next_until = older_windows[len(tasks)]
+                    tasks.append(asyncio.create_task(
+                        fetch_window(client, semaphore, user, base_url, next_since, next_until, max_pages,
+                                     max_tweets - tweets_saved, seen_fingerprints)
+                    ))
+
+                tweets = await tasks[index]
+                print(f"Fetched {len(tweets)} tweets from {since} to {until}.")
+                tweets_saved = write_nitter_tweets(tweets, max_tweets, tweets_saved, seen_fingerprints, output,
+                                                   writer, scrape_datetime)
+
+                if tweets_saved >= max_tweets:
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    return tweets_saved
+
+
+def scrape_phivolcs_nitter(output_file, user="phivolcs_dost", base_url="https://nitter.net", max_tweets=40,
+                           max_pages=10, num_windows=8, window_days=7, concurrency=8, seen_fingerprints_file=None):
+    """
+    Scrapes earthquake information tweets from PHIVOLCS through a Nitter instance over plain HTTP,
+    without starting a browser. Only tweets from the last num_windows * window_days days
+    (8 weeks by default) are searched.
+
+    Args:
+        output_file (str): Raw tweets CSV, written incrementally as tweets are found
+        user (str): Twitter/X handle of the PHIVOLCS account
+        base_url (str): Base URL of the Nitter instance
+        max_tweets (int): Maximum number of tweets to scrape
+        max_pages (int): Maximum number of pages to follow in each date window
+        num_windows (int): Number of date windows, going back from today
+        window_days (int): Length of each date window in days
+        concurrency (int): Maximum number of requests in flight at once
+        seen_fingerprints_file (str): .npy file of tweets seen by earlier runs, skipped and updated in place
+
+    Returns:
+        int: Number of new earthquake tweets written to output_file, or None if the timeline
+            could not be fetched (as opposed to 0 when there was nothing new)
+    """
+    print(f"Fetching {base_url}/{user} over HTTP...")
+    seen_fingerprints = load_seen_fingerprints(seen_fingerprints_file)
+    output, writer = open_tweet_writer(output_file)
+
+    try:
+        tweets_saved = asyncio.run(scrape_nitter_timeline(user, base_url, max_tweets, max_pages, num_windows,
+                                                          window_days, concurrency, seen_fingerprints,
+                                                          output, writer))
+    finally:
+        output.close()
+        save_seen_fingerprints(seen_fingerprints, seen_fingerprints_file)
+
+    if tweets_saved is None:
+        print(f"Could not fetch any tweets from {base_url}.")
+    else:
+        print(f"Successfully scraped {tweets_saved} new earthquake tweets.")
+    return tweets_saved
+
+
+def parse_user_tweets_response(data):
+    """
+    Extracts tweets from the JSON of an X UserTweets GraphQL response
+
+    Args:
+        data (dict): Decoded response body
 
-def scrape_phivolcs_twitter(url="https://x.com/phivolcs_dost", max_tweets=40, scroll_pause_time=2,
-                            max_scroll_attempts=200, no_new_tweets_threshold=10):
+    Returns:
+        list: List of dicts with text, datetime and url keys
+    """
+    tweets = []
+    user_result = ((data.get('data') or {}).get('user') or {}).get('result') or {}
+    timeline = user_result.get('timeline_v2') or user_result.get('timeline') or {}
+
+    for instruction in (timeline.get('timeline') or {}).get('instructions', []):
+        entries = instruction.get('entries') or ([instruction['entry']] if 'entry' in instruction else [])
+
+        for entry in entries:
+            content = entry.get('content') or {}
+            # Single tweets carry itemContent directly, conversation modules nest them in items
+            item_contents = [content.get('itemContent')] + [
+                (item.get('item') or {}).get('itemContent') for item in content.get('items', [])
+            ]
+
+            for item_content in item_contents:
+                result = ((item_content or {}).get('tweet_results') or {}).get('result') or {}
+                result = result.get('tweet', result)  # TweetWithVisibilityResults wraps the tweet
+                legacy = result.get('legacy')
+                if not legacy:
+                    continue
+
+                note_text = (((result.get('note_tweet') or {}).get('note_tweet_results') or {})
+                             .get('result') or {}).get('text')
+                user = ((result.get('core') or {}).get('user_results') or {}).get('result') or {}
+                screen_name = (user.get('core') or {}).get('screen_name') or \
+                    (user.get('legacy') or {}).get('screen_name') or 'i/web'
+                tweet_id = result.get('rest_id') or legacy.get('id_str')
+
+                try:
+                    datetime_str = datetime.strptime(legacy.get('created_at', ''), "%a %b %d %H:%M:%S %z %Y") \
+                        .strftime("%Y-%m-%dT%H:%M:%S.000Z")
+                except ValueError:
+                    datetime_str = legacy.get('created_at')
+
+                tweets.append({
+                    'text': html.unescape(note_text or legacy.get('full_text', '')),
+                    'datetime': datetime_str,
+                    'url': f"https://x.com/{screen_name}/status/{tweet_id}" if tweet_id else None
+                })
+
+    return tweets
+
+
+def read_graphql_tweets(driver, pending_request_ids):
+    """
+    Collects tweets from the UserTweets GraphQL responses received since the last call,
+    using the Chrome performance log and the DevTools Protocol instead of the rendered DOM
+
+    Args:
+        driver (WebDriver): Chrome driver started with performance logging enabled
+        pending_request_ids (set): UserTweets requests still loading, kept between calls
+
+    Returns:
+        list: List of dicts with text, datetime and url keys
+    """
+    tweets = []
+
+    try:
+        log_entries = driver.get_log('performance')
+    except Exception as e:
+        print(f"Error reading the performance log: {e}")
+        return tweets
+
+    for log_entry in log_entries:
+        try:
+            message = json.loads(log_entry['message'])['message']
+        except (KeyError, ValueError):
+            continue
+
+        method = message.get('method')
+        params = message.get('params') or {}
+
+        if method == 'Network.responseReceived':
+            if 'UserTweets' in (params.get('response') or {}).get('url', ''):
+                pending_request_ids.add(params.get('requestId'))
+
+        # The body can only be read once the response has finished loading
+        elif method == 'Network.loadingFinished' and params.get('requestId') in pending_request_ids:
+            pending_request_ids.discard(params['requestId'])
+            try:
+                response = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': params['requestId']})
+                body = response['body']
+                if response.get('base64Encoded'):
+                    body = base64.b64decode(body).decode('utf-8')
+                tweets.extend(parse_user_tweets_response(json.loads(body)))
+            except Exception as e:
+                print(f"Error reading UserTweets response: {e}")
+
+    return tweets
+
+
+def get_chromedriver_service(force_install=False):
+    """
+    Creates the ChromeDriver service without asking webdriver-manager for the latest version on every run.
+    Uses $CHROMEDRIVER if it is set, then the driver installed by a previous run, then
+    /usr/local/bin/chromedriver, and only downloads a driver when none of them exists.
+
+    Args:
+        force_install (bool): Skip local drivers and install the one matching the current Chrome,
+            used when the local driver no longer matches the browser
+
+    Returns:
+        Service: ChromeDriver service
+    """
+    # Path webdriver-manager returned last time
+    cache_file = os.path.join(os.path.expanduser('~'), '.wdm', 'phivolcs_chromedriver_path')
+
+    if not force_install:
+        driver_path = os.environ.get('CHROMEDRIVER')
+        if driver_path and os.path.isfile(driver_path):
+            return Service(executable_path=driver_path)
+
+        # The cached driver goes before the system one, which may be the stale driver it replaced
+        try:
+            with open(cache_file, encoding='utf-8') as f:
+                driver_path = f.read().strip()
+            if os.path.isfile(driver_path):
+                return Service(executable_path=driver_path)
+        except FileNotFoundError:
+            pass
+
+        if os.path.isfile('/usr/local/bin/chromedriver'):
+            return Service(executable_path='/usr/local/bin/chromedriver')
+
+    print("Installing ChromeDriver with webdriver-manager...")
+    driver_path = ChromeDriverManager().install()
+
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            f.write(driver_path)
+    except OSError as e:
+        print(f"Error caching ChromeDriver path: {e}")
+
+    return Service(executable_path=driver_path)
+
+
+def scrape_phivolcs_twitter(output_file, url="https://x.com/phivolcs_dost", max_tweets=40, scroll_pause_time=2,
+                            max_scroll_attempts=200, no_new_tweets_threshold=10, seen_fingerprints_file=None):
     """
     Scrapes earthquake information tweets from PHIVOLCS Twitter/X account with improved reliability.
 
     Args:
+        output_file (str): Raw tweets CSV, written incrementally as tweets are found
         url (str): URL of the PHIVOLCS Twitter/X page
         max_tweets (int): Maximum number of tweets to scrape
-        scroll_pause_time (int): Time to pause between scrolls
+        scroll_pause_time (int): Maximum time to wait for new tweets to render after each scroll
         max_scroll_attempts (int): Maximum number of scroll attempts
-        no_new_tweets_threshold (int): Stop after this many scroll attempts with no new tweets
+        no_new_tweets_threshold (int): Stop after this many scroll attempts with no new tweets, or with
+            no change in page height at the bottom of the page (end of feed)
+        seen_fingerprints_file (str): .npy file of tweets seen by earlier runs, skipped and updated in place
 
     Returns:
-        DataFrame: DataFrame containing earthquake information tweets
+        int: Number of earthquake tweets written to output_file
     """
     print("Setting up the Chrome driver...")
     chrome_options = Options()
-    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--headless=new")  # Full Chrome in headless mode, lighter than the legacy shell
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
     chrome_options.add_argument("--disable-blink-features=AutomationControlled")  # Hide automation
+    # Turn off browser features the scraper never uses
+    for argument in ["--disable-gpu", "--disable-extensions", "--disable-background-networking", "--disable-sync",
+                     "--metrics-recording-only", "--mute-audio", "--no-first-run", "--disable-default-apps"]:
+        chrome_options.add_argument(argument)
     chrome_options.add_argument(
         "--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/90.0.4430.212 Safari/537.36")
+    # Record network events so the timeline's GraphQL responses can be read through CDP
+    chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    # Only the DOM text is needed, skip downloading and decoding images and media (JS stays on)
+    chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+    chrome_options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.default_content_setting_values.media_stream": 2
+    })
+    # Return from driver.get on DOMContentLoaded instead of waiting for every image and script
+    chrome_options.page_load_strategy = 'eager'
 
     # Initialize the Chrome driver with explicit waits
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
+    try:
+        driver = webdriver.Chrome(service=get_chromedriver_service(), options=chrome_options)
+    except SessionNotCreatedException as e:
+        # Usually Chrome updated itself and the local driver is now too old
+        print(f"Could not start Chrome with the local ChromeDriver ({e.msg}), installing a matching one...")
+        driver = webdriver.Chrome(service=get_chromedriver_service(force_install=True), options=chrome_options)
+    driver.execute_cdp_cmd("Network.enable", {})
+    # Chrome has no content setting for stylesheets, block them at the network level instead
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": ["*.css"]})
     driver.maximize_window()
 
     print(f"Navigating to {url}...")
     driver.get(url)
 
-    # Extended initial wait for page to load with randomization
-    initial_wait = 8 + random.random() * 4  # Between 8-12 seconds
-    print(f"Waiting {initial_wait:.2f} seconds for page to load...")
-    time.sleep(initial_wait)
-
-    # List to store tweet data and set to track seen tweet URLs
-    tweets_data = []
-    seen_tweet_urls = set()
+    # Wait until the first tweet is rendered instead of sleeping a fixed time
+    print("Waiting for the first tweet to load...")
+    try:
+        WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.CSS_SELECTOR, 'article')))
+    except TimeoutException:
+        print("Timeout while waiting for the first tweet, continuing anyway")
+
+    # Stream tweets to the output file and track fingerprints of seen tweet URLs
+    output, writer = open_tweet_writer(output_file)
+    tweets_saved = 0
+    scrape_datetime = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    seen_fingerprints = load_seen_fingerprints(seen_fingerprints_file)
     scroll_attempts = 0
     consecutive_no_new_tweets = 0
-
-    # Get initial viewport height
-    viewport_height = driver.execute_script("return window.innerHeight")
+    stagnant_scrolls = 0
 
     # Create a WebDriverWait instance for finding elements
     wait = WebDriverWait(driver, 10)
 
+    # UserTweets responses seen in the performance log whose body has not been read yet
+    pending_request_ids = set()
+
     try:
         print("Scrolling through the feed to capture recent tweets...")
-        while len(tweets_data) < max_tweets and scroll_attempts < max_scroll_attempts:
-            # Use more robust XPATH to find tweets
-            try:
-                tweet_elements = wait.until(
-                    EC.presence_of_all_elements_located((By.XPATH,
-                                                         "//article[contains(@data-testid, 'tweet') or contains(@class, 'tweet') or contains(@role, 'article')]"))
-                )
-            except TimeoutException:
-                print("Timeout while waiting for tweets to load")
-                # Try a different approach if the first one fails
+        while tweets_saved < max_tweets and scroll_attempts < max_scroll_attempts:
+            # Read the tweets straight from the GraphQL responses the page received
+            tweet_dicts = read_graphql_tweets(driver, pending_request_ids)
+
+            if not tweet_dicts:
+                # Fall back to the rendered DOM, waiting for at least one tweet first
+                try:
+                    wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "article")))
+                except TimeoutException:
+                    print("Timeout while waiting for tweets to load")
+
+                # Pull text, time and URL of every rendered tweet in a single WebDriver round-trip
                 try:
-                    tweet_elements = driver.find_elements(By.XPATH,
-                                                          "//div[contains(@data-testid, 'cellInnerDiv')]//article")
-                except:
-                    tweet_elements = []
+                    tweet_dicts = driver.execute_script(EXTRACT_TWEETS_JS) or []
+                except Exception as e:
+                    print(f"Error extracting tweets from the page: {e}")
+                    tweet_dicts = []
 
             tweets_found_this_scroll = 0
 
-            for tweet in tweet_elements:
-                if len(tweets_data) >= max_tweets:
+            for tweet in tweet_dicts:
+                if tweets_saved >= max_tweets:
                     break
 
+                tweet_text = (tweet.get('text') or '').strip()
+                datetime_str = tweet.get('datetime')
+                tweet_url = tweet.get('url')
+
+                # Skip if no text was found
+                if not tweet_text:
+                    continue
+
+                # More flexible earthquake tweet detection
+                if not is_earthquake_tweet(tweet_text):
+                    continue
+
+                # Only process tweets with a valid URL that we haven't seen before
+                if not tweet_url:
+                    continue
+
+                fingerprint = tweet_fingerprint(tweet_url)
+                if fingerprint not in seen_fingerprints:
+                    seen_fingerprints.add(fingerprint)
+
+                    # Parse earthquake information
+                    earthquake_info = parse_earthquake_tweet(tweet_text)
+
+                    # Create a data dictionary for this tweet
+                    tweet_data = {
+                        'tweet_text': tweet_text,
+                        'datetime': datetime_str,
+                        'tweet_url': tweet_url,
+                        **earthquake_info,
+                        'scrape_datetime': scrape_datetime
+                    }
+
+                    writer.writerow(tweet_data)
+                    output.flush()
+                    tweets_saved += 1
+                    tweets_found_this_scroll += 1
+                    print(f"Earthquake tweet found! Total: {tweets_saved}")
+
+            # Scroll one viewport at a time, the timeline is virtualized and only renders the tweets near
+            # the viewport, so jumping further would skip tweets for the DOM fallback
+            prev_height = driver.execute_script("return document.body.scrollHeight")
+            reached_bottom = driver.execute_script(
+                "window.scrollBy(0, window.innerHeight * 0.9);"
+                "return window.innerHeight + window.scrollY >= document.body.scrollHeight - 1;"
+            )
+
+            if reached_bottom:
+                # Continue as soon as the next page of the feed renders instead of sleeping a fixed time
                 try:
-                    # More robust method to extract tweet text
-                    tweet_text = ""
-
-                    # Try multiple approaches to find the tweet text
-                    text_elements = tweet.find_elements(By.XPATH,
-                                                        ".//div[contains(@data-testid, 'tweetText')]")
-
-                    if not text_elements:
-                        # Alternative selector
-                        text_elements = tweet.find_elements(By.XPATH,
-                                                            ".//div[contains(@lang, 'en') or contains(@lang, 'tl')]")
-
-                    for text_element in text_elements:
-                        tweet_text += text_element.text + " "
-
-                    tweet_text = tweet_text.strip()
-
-                    # Skip if no text was found
-                    if not tweet_text:
-                        continue
-
-                    # More flexible earthquake tweet detection
-                    if any(keyword in tweet_text.upper() for keyword in [
-                        "EARTHQUAKE", "MAGNITUDE", "LINDOL", "INTENSITY", "PHIVOLCS", "SEISMIC", "TREMOR"
-                    ]):
-                        # Extract time of posting with better error handling
-                        time_elements = tweet.find_elements(By.CSS_SELECTOR, 'time')
-                        datetime_str = None
-
-                        if time_elements:
-                            try:
-                                datetime_str = time_elements[0].get_attribute('datetime')
-                            except:
-                                # Try to get the tweet time from the time element text
-                                datetime_str = time_elements[0].text
-
-                        # Get tweet URL with better error handling
-                        tweet_url = None
-                        try:
-                            # Check multiple possible link patterns
-                            tweet_links = tweet.find_elements(By.CSS_SELECTOR, 'a[href*="/status/"]')
-                            if not tweet_links:
-                                # Try alternative way to find links
-                                tweet_links = tweet.find_elements(By.CSS_SELECTOR, 'a[role="link"]')
-
-                            for link in tweet_links:
-                                href = link.get_attribute('href')
-                                if href and '/status/' in href:
-                                    tweet_url = href
-                                    break
-                        except Exception as e:
-                            print(f"Error extracting tweet URL: {e}")
-
-                        # Only process tweets with a valid URL that we haven't seen before
-                        if tweet_url and tweet_url not in seen_tweet_urls:
-                            seen_tweet_urls.add(tweet_url)
-
-                            # Parse earthquake information
-                            earthquake_info = parse_earthquake_tweet(tweet_text)
-
-                            # Create a data dictionary for this tweet
-                            tweet_data = {
-                                'tweet_text': tweet_text,
-                                'datetime': datetime_str,
-                                'tweet_url': tweet_url,
-                                **earthquake_info
-                            }
-
-                            tweets_data.append(tweet_data)
-                            tweets_found_this_scroll += 1
-                            print(f"Earthquake tweet found! Total: {len(tweets_data)}")
-
-                except StaleElementReferenceException:
-                    # The page was updated during processing
-                    print("Encountered stale element - page updated during processing")
-                    break
-
-                except Exception as e:
-                    print(f"Error processing individual tweet: {e}")
-
-            # Variable scroll distance with randomization to appear more human-like
-            scroll_factor = 0.7 + random.random() * 0.4  # Between 0.7-1.1
-            scroll_distance = viewport_height * scroll_factor
-
-            # Use a smoother scrolling mechanism
-            driver.execute_script(f"""
-                window.scrollBy({{
-                    top: {scroll_distance},
-                    left: 0,
-                    behavior: 'smooth'
-                }});
-            """)
+                    WebDriverWait(driver, scroll_pause_time, poll_frequency=0.25,
+                                  ignored_exceptions=(StaleElementReferenceException,)).until(
+                        lambda d: d.execute_script("return document.body.scrollHeight") > prev_height
+                    )
+                except TimeoutException:
+                    pass
+
+                # The feed has ended once the page stops growing at the bottom
+                new_height = driver.execute_script("return document.body.scrollHeight")
+                if new_height == prev_height:
+                    stagnant_scrolls += 1
+                else:
+                    stagnant_scrolls = 0
+            else:
+                stagnant_scrolls = 0
 
-            # Variable wait time between scrolls
-            actual_pause = scroll_pause_time + random.random() * 2  # Add 0-2 seconds randomly
-            time.sleep(actual_pause)
+            if stagnant_scrolls >= no_new_tweets_threshold:
+                print(f"Page height unchanged after {no_new_tweets_threshold} consecutive scrolls, reached the end of the feed.")
+                break
 
             scroll_attempts += 1
 
@@ -199,13 +913,7 @@ def scrape_phivolcs_twitter(url="https://x.com/phivolcs_dost", max_tweets=40, sc
 
             # Provide progress updates
             print(
-                f"Scroll attempt {scroll_attempts}/{max_scroll_attempts}. Found {len(tweets_data)}/{max_tweets} tweets.")
-
-            # Occasionally refresh the page if we're not finding enough tweets
-            if scroll_attempts % 30 == 0 and len(tweets_data) < max_tweets * 0.5:
-                print("Refreshing the page to try to find more tweets...")
-                driver.refresh()
-                time.sleep(initial_wait)  # Wait for page to reload
+                f"Scroll attempt {scroll_attempts}/{max_scroll_attempts}. Found {tweets_saved}/{max_tweets} tweets.")
 
     except Exception as e:
         print(f"An error occurred during scraping: {e}")
@@ -214,24 +922,11 @@ def scrape_phivolcs_twitter(url="https://x.com/phivolcs_dost", max_tweets=40, sc
         # Close the browser
         print("Closing browser...")
         driver.quit()
+        output.close()
+        save_seen_fingerprints(seen_fingerprints, seen_fingerprints_file)
 
-    # Convert to DataFrame
-    df = pd.DataFrame(tweets_data)
-
-    # Add timestamp of when scraping was performed
-    now = datetime.now()
-    df['scrape_datetime'] = now.strftime("%Y-%m-%d %H:%M:%S")
-
-    # Sort tweets by datetime to ensure most recent first
-    if not df.empty and 'datetime' in df.columns:
-        try:
-            df['datetime'] = pd.to_datetime(df['datetime'], errors='coerce')
-            df = df.sort_values('datetime', ascending=False).reset_index(drop=True)
-        except Exception as e:
-            print(f"Error sorting by datetime: {e}")
-
-    print(f"Successfully scraped {len(df)} earthquake tweets.")
-    return df
+    print(f"Successfully scraped {tweets_saved} earthquake tweets.")
+    return tweets_saved
 
 
 def parse_earthquake_tweet(tweet_text):
@@ -248,167 +943,59 @@ def parse_earthquake_tweet(tweet_text):
         'intensity': None
     }
 
-    # Improved regex patterns with more variations
-
-    # Magnitude patterns
-    magnitude_patterns = [
-        r'Magnitude\s*[=:]\s*(\d+\.?\d*)',
-        r'M[=:]\s*(\d+\.?\d*)',
-        r'M\s+(\d+\.?\d*)',
-        r'Magnitude\s+(\d+\.?\d*)'
-    ]
-
-    for pattern in magnitude_patterns:
-        match = re.search(pattern, tweet_text, re.IGNORECASE)
-        if match:
-            info['magnitude'] = match.group(1)
-            break
-
-    # Depth patterns
-    depth_patterns = [
-        r'Depth\s*[=:]\s*(\d+\s*km)',
-        r'D[=:]\s*(\d+\s*km)',
-        r'Depth\s+(\d+\s*km)',
-        r'depth of\s+(\d+\s*km)'
-    ]
-
-    for pattern in depth_patterns:
-        match = re.search(pattern, tweet_text, re.IGNORECASE)
-        if match:
-            info['depth'] = match.group(1)
-            break
-
-    # Location patterns
-    location_patterns = [
-        r'Location\s*[=:]\s*([^\n]+)',
-        r'L[=:]\s*([^\n]+)'
-    ]
+    if TWEET_FIELD_DATABASE is not None:
+        # One Hyperscan pass finds the labels, re only reads the value that follows each one
+        data = tweet_text.encode('utf-8')
+        label_ends = {}
+        TWEET_FIELD_DATABASE.scan(data, match_event_handler=record_label_match, context=label_ends)
+
+        # Prefer the earliest label of each field over where in the tweet it appears
+        for pattern_id in sorted(label_ends):
+            field, index = TWEET_FIELD_PATTERN_IDS[pattern_id]
+            if info[field] is not None:
+                continue
+
+            # The label match ends after the first byte of the value, convert that to a character offset
+            offset = len(data[:label_ends[pattern_id] - 1].decode('utf-8'))
+            match = TWEET_FIELD_VALUE_PATTERNS[field].match(tweet_text, offset)
+            if match is None:
+                # Only the first hit of each label is reported, when its value does not fit (e.g. a
+                # depth without km) look for a later one like the re path below does
+                match = TWEET_FIELD_PATTERNS[field][index].search(tweet_text, offset)
+            if match:
+                info[field] = match.group(field).strip()
 
-    for pattern in location_patterns:
-        match = re.search(pattern, tweet_text, re.IGNORECASE)
-        if match:
-            info['location'] = match.group(1).strip()
-            break
+        return info
 
-    # Date and Time patterns
-    datetime_patterns = [
-        r'Date\s*and\s*Time\s*[=:]\s*([^\n]+)',
-        r'Date[=:]\s*([^\n]+)',
-        r'Occurred on\s*([^\n]+)'
-    ]
-
-    for pattern in datetime_patterns:
-        match = re.search(pattern, tweet_text, re.IGNORECASE)
-        if match:
-            info['date_time'] = match.group(1).strip()
-            break
+    # Skip the regex for fields whose required text is missing, a substring check is much cheaper.
+    # Not needed with Hyperscan above, which finds every field in a single pass.
+    for field, patterns in TWEET_FIELD_PATTERNS.items():
+        anchors = TWEET_FIELD_ANCHORS.get(field)
+        if anchors and not any(anchor in tweet_text for anchor in anchors):
+            continue
 
-    # Intensity patterns (new)
-    intensity_patterns = [
-        r'Intensity\s*[=:]\s*([^\n]+)',
-        r'Reported Intensity\s*[=:]\s*([^\n]+)'
-    ]
-
-    for pattern in intensity_patterns:
-        match = re.search(pattern, tweet_text, re.IGNORECASE)
-        if match:
-            info['intensity'] = match.group(1).strip()
-            break
+        for pattern in patterns:
+            match = pattern.search(tweet_text)
+            if match:
+                info[field] = match.group(field).strip()
+                break
 
     return info
 
 
-def extract_info_from_text(text):
+def find_last_field(pattern, text):
     """
-    More detailed extraction of earthquake information using regex patterns
+    Finds the value of the last occurrence of a field in a tweet
 
     Args:
+        pattern (re.Pattern): Regex of the field from TEXT_FIELD_PATTERNS, with a single group
         text (str): Tweet text
 
     Returns:
-        dict: Dictionary with extracted information
+        str: Value of the last match, or None if the field does not appear
     """
-    info = {
-        "Date and Time": None,
-        "Magnitude": None,
-        "Depth": None,
-        "Location": None,
-        "Intensity": None
-    }
-
-    # Break text into lines for line-by-line processing
-    lines = text.split('\n')
-
-    # Process each line
-    for line in lines:
-        # Date and Time patterns - FIXED
-        if any(keyword.upper() in line.upper() for keyword in ["DATE AND TIME", "DATE", "OCCURRED ON"]):
-            try:
-                # Split by first colon only
-                dt_parts = line.split(':', 1)
-                if len(dt_parts) > 1:
-                    # Take everything after the first colon as the datetime value
-                    info["Date and Time"] = dt_parts[1].strip()
-            except Exception as e:
-                print(f"Error parsing date and time: {e}")
-
-        # Magnitude patterns
-        elif "Magnitude" in line:
-            match = re.search(r"Magnitude\s*[=:]\s*([0-9.]+)", line, re.IGNORECASE)
-            if match:
-                info["Magnitude"] = match.group(1).strip()
-
-        # Depth patterns
-        elif "Depth" in line:
-            match = re.search(r"Depth\s*[=:]\s*([0-9]+\s*km)", line, re.IGNORECASE)
-            if match:
-                info["Depth"] = match.group(1).strip()
-
-        # Location patterns
-        elif "Location" in line:
-            match = re.search(r"Location\s*[=:]\s*(.*)", line, re.IGNORECASE)
-            if match:
-                info["Location"] = match.group(1).strip()
-
-        # Intensity patterns
-        elif "Intensity" in line:
-            match = re.search(r"(?:Reported )?Intensity\s*[=:]\s*(.*)", line, re.IGNORECASE)
-            if match:
-                info["Intensity"] = match.group(1).strip()
-
-    # Try alternate method if line parsing didn't work for date and time
-    if not info["Date and Time"]:
-        try:
-            # Better regex pattern for date and time that handles multiline
-            date_time_pattern = r"(?:Date and Time|Date):\s*(.*?)(?=\n\w+:|$)"
-            match = re.search(date_time_pattern, text, re.IGNORECASE | re.DOTALL)
-            if match:
-                info["Date and Time"] = match.group(1).strip()
-        except Exception as e:
-            print(f"Error with alternate date-time parsing: {e}")
-
-    # Try to parse from the full text if line-by-line approach didn't find everything else
-    if not info["Magnitude"]:
-        match = re.search(r"Magnitude\s*[=:]\s*([0-9.]+)", text, re.IGNORECASE)
-        if match:
-            info["Magnitude"] = match.group(1).strip()
-
-    if not info["Depth"]:
-        match = re.search(r"Depth\s*[=:]\s*([0-9]+\s*km)", text, re.IGNORECASE)
-        if match:
-            info["Depth"] = match.group(1).strip()
-
-    if not info["Location"]:
-        match = re.search(r"Location\s*[=:]\s*(.*?)(?:\n\w+:|$)", text, re.IGNORECASE | re.DOTALL)
-        if match:
-            info["Location"] = match.group(1).strip()
-
-    if not info["Intensity"]:
-        match = re.search(r"(?:Reported )?Intensity\s*[=:]\s*(.*?)(?:\n\w+:|$)", text, re.IGNORECASE | re.DOTALL)
-        if match:
-            info["Intensity"] = match.group(1).strip()
-
-    return info
+    matches = pattern.findall(text)
+    return matches[-1].strip() if matches else None
 
 
 def clean_earthquake_data(df):
@@ -425,9 +1012,14 @@ def clean_earthquake_data(df):
         print("No valid tweet data to clean")
         return pd.DataFrame()
 
-    # Apply the cleaning function
-    extracted_data = df["tweet_text"].apply(extract_info_from_text)
-    cleaned_df = pd.DataFrame(extracted_data.tolist())
+    # Run each precompiled field regex over the texts, when a field appears more than once in a
+    # tweet the last occurrence wins. A plain loop over findall beats str.extractall here, which
+    # pays for a MultiIndex frame and a groupby per field.
+    tweet_texts = df["tweet_text"].fillna('').astype(str).tolist()
+    cleaned_df = pd.DataFrame({
+        column: [find_last_field(TEXT_FIELD_PATTERNS[field], text) for text in tweet_texts]
+        for field, column in TEXT_FIELD_COLUMNS.items()
+    })
 
     # Add original URLs and datetime from the source dataframe
     if 'tweet_url' in df.columns:
@@ -457,8 +1049,7 @@ def save_to_csv(df, filename, delimiter=','):
     """
     try:
         # Create a timestamped filename to avoid overwriting previous results
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename_with_timestamp = f"{filename.split('.')[0]}_{timestamp}.{filename.split('.')[1]}"
+        filename_with_timestamp = timestamped_filename(filename)
 
         df.to_csv(filename_with_timestamp, index=False, sep=delimiter, encoding='utf-8')
         print(f"Data saved to {filename_with_timestamp}")
@@ -467,6 +1058,30 @@ def save_to_csv(df, filename, delimiter=','):
         print(f"Error saving data to CSV: {e}")
 
 
+def save_to_parquet(df, filename):
+    """
+    Save the DataFrame to a zstd-compressed Parquet file with error handling
+
+    Args:
+        df (DataFrame): DataFrame to save
+        filename (str): Output filename
+
+    Returns:
+        bool: True if the file was written
+    """
+    try:
+        # Create a timestamped filename to avoid overwriting previous results
+        filename_with_timestamp = timestamped_filename(filename)
+
+        df.to_parquet(filename_with_timestamp, engine='pyarrow', compression='zstd', index=False)
+        print(f"Data saved to {filename_with_timestamp}")
+        return True
+
+    except Exception as e:
+        print(f"Error saving data to Parquet: {e}")
+        return False
+
+
 def main():
     print(f"Starting PHIVOLCS earthquake information scraper at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}...")
 
@@ -475,29 +1090,50 @@ def main():
     scroll_pause_time = 2.5  # Slightly longer pauses between scrolls
     max_scroll_attempts = 300  # More scroll attempts to reach target
     no_new_tweets_threshold = 15  # Stop after this many scrolls with no new tweets
-
-    # Step 1: Scrape tweets with improved parameters
-    raw_df = scrape_phivolcs_twitter(
-        max_tweets=max_tweets,
-        scroll_pause_time=scroll_pause_time,
-        max_scroll_attempts=max_scroll_attempts,
-        no_new_tweets_threshold=no_new_tweets_threshold
-    )
-
-    if not raw_df.empty:
-        print(f"Successfully scraped {len(raw_df)} earthquake information tweets.")
-
-        # Save the raw data
-        raw_output_file = "phivolcs_earthquake_data_raw.csv"
-        save_to_csv(raw_df, raw_output_file)
+    use_nitter = True  # Fetch over plain HTTP from a Nitter instance instead of driving Chrome
+    nitter_base_url = "https://nitter.net"
+    seen_fingerprints_file = None  # e.g. "phivolcs_seen_tweets.npy" to only collect tweets not seen by earlier runs
+    save_csv = False  # Also write the cleaned data as CSV for inspection, always done if Parquet cannot be written
+
+    # Raw tweets are streamed to this file while scraping
+    raw_output_file = timestamped_filename("phivolcs_earthquake_data_raw.csv")
+
+    # Step 1: Scrape tweets, over HTTP first and with the browser as a fallback
+    tweets_saved = None
+    if use_nitter:
+        tweets_saved = scrape_phivolcs_nitter(raw_output_file, base_url=nitter_base_url, max_tweets=max_tweets,
+                                              seen_fingerprints_file=seen_fingerprints_file)
+
+    # Only fall back when fetching failed, not when there were simply no new tweets
+    if tweets_saved is None:
+        if use_nitter:
+            print("Could not fetch tweets over HTTP, falling back to the Selenium scraper...")
+        tweets_saved = scrape_phivolcs_twitter(
+            raw_output_file,
+            max_tweets=max_tweets,
+            scroll_pause_time=scroll_pause_time,
+            max_scroll_attempts=max_scroll_attempts,
+            no_new_tweets_threshold=no_new_tweets_threshold,
+            seen_fingerprints_file=seen_fingerprints_file
+        )
+
+    if tweets_saved > 0:
+        print(f"Successfully scraped {tweets_saved} earthquake information tweets.")
+        print(f"Raw data saved to {raw_output_file}")
+
+        # Read the raw data back, sorted most recent first
+        raw_df = load_raw_tweets(raw_output_file)
+        save_to_parquet(raw_df, "phivolcs_earthquake_data_raw.parquet")
 
         # Step 2: Clean the data
         print("Cleaning and extracting structured data...")
         cleaned_df = clean_earthquake_data(raw_df)
 
-        # Save the cleaned data with semicolon delimiter
-        cleaned_output_file = "earthquake_data_cleaned.csv"
-        save_to_csv(cleaned_df, cleaned_output_file, delimiter=';')
+        # Save the cleaned data, also as CSV with semicolon delimiter when asked or when Parquet fails
+        parquet_saved = save_to_parquet(cleaned_df, "earthquake_data_cleaned.parquet")
+        if save_csv or not parquet_saved:
+            cleaned_output_file = "earthquake_data_cleaned.csv"
+            save_to_csv(cleaned_df, cleaned_output_file, delimiter=';')
 
         # Configure pandas to display all columns and content
         pd.set_option('display.max_columns', None)  # Show all columns
@@ -512,7 +1148,7 @@ def main():
         print(f"Total structured records after cleaning: {len(cleaned_df)}")
 
     else:
-        print("No earthquake information tweets were found.")
+        print("No new earthquake information tweets were found.")
 
 
 if __name__ == "__main__":